@@ -1,11 +1,16 @@
+import asyncio
+import hashlib
 import os
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from time import monotonic
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
 from uuid import UUID
 from datetime import datetime
 
 from ..database import get_db
 from ..models import (
+    EVAL_RUN_LIST_TA,
     EvalRun,
     EvalRunFilters,
     PaginationParams,
@@ -13,15 +18,26 @@ from ..models import (
     IngestResponse,
     PaginatedResponse,
 )
+from ..caching import IMMUTABLE_CACHE_CONTROL, etag_matches, make_etag
 from ..config import settings
+from ..pagination import (
+    decode_cursor,
+    encode_cursor,
+    get_cached_count,
+    invalidate_cached_counts,
+    set_cached_count,
+)
 
 router = APIRouter()
 
+CURSOR_TIMESTAMP_TA = TypeAdapter(datetime)
+
 
-@router.get("", response_model=PaginatedResponse)
+@router.get("", response_model=PaginatedResponse[EvalRun])
 async def list_eval_runs(
     offset: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     model_name: Optional[str] = None,
     eval_type: Optional[str] = None,
     start_date: Optional[datetime] = None,
@@ -29,123 +45,186 @@ async def list_eval_runs(
     min_score: Optional[float] = None,
     max_score: Optional[float] = None,
 ):
-    """List all evaluation runs with optional filters."""
-    db = get_db()
-
-    query = db.table("eval_runs").select("*, eval_samples(count)", count="exact")
-
-    if model_name:
-        query = query.ilike("model_name", f"%{model_name}%")
-    if eval_type:
-        query = query.eq("eval_type", eval_type)
-    if start_date:
-        query = query.gte("timestamp", start_date.isoformat())
-    if end_date:
-        query = query.lte("timestamp", end_date.isoformat())
-    if min_score is not None:
-        query = query.gte("overall_score", min_score)
-    if max_score is not None:
-        query = query.lte("overall_score", max_score)
-
-    response = query.order("timestamp", desc=True).range(offset, offset + limit - 1).execute()
-
-    total_response = (
-        db.table("eval_runs").select("*", count="exact", head=True).execute()
-    )
-    total = total_response.count if total_response.count else 0
-
-    items = []
-    for row in response.data:
-        sample_count = row.get("eval_samples", [{}])[0].get("count", 0) if row.get("eval_samples") else 0
-        items.append(
-            EvalRun(
-                id=row["id"],
-                name=row["name"],
-                model_name=row.get("model_name"),
-                eval_type=row.get("eval_type"),
-                timestamp=row["timestamp"],
-                overall_score=row.get("overall_score"),
-                metrics=row.get("metrics", {}),
-                metadata=row.get("metadata", {}),
-                file_path=row.get("file_path"),
-                created_at=row["created_at"],
-                sample_count=sample_count,
-            )
+    """
+    List all evaluation runs with optional filters.
+
+    Pass the previous page's next_cursor to seek on (timestamp, id) instead of
+    skipping rows with offset.
+    """
+    db = await get_db()
+
+    cursor_filter = None
+    if cursor:
+        try:
+            cursor_ts, cursor_id = decode_cursor(cursor, 2)
+            if not isinstance(cursor_ts, str):
+                raise ValueError("Malformed cursor timestamp")
+            # Re-serialize so only a real timestamp, never raw cursor text, reaches the filter
+            cursor_ts = CURSOR_TIMESTAMP_TA.validate_python(cursor_ts).isoformat()
+            cursor_id = str(UUID(str(cursor_id)))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        cursor_filter = (
+            f'timestamp.lt."{cursor_ts}",'
+            f'and(timestamp.eq."{cursor_ts}",id.lt.{cursor_id})'
+        )
+
+    def apply_filters(query):
+        if model_name:
+            query = query.ilike("model_name", f"%{model_name}%")
+        if eval_type:
+            query = query.eq("eval_type", eval_type)
+        if start_date:
+            query = query.gte("timestamp", start_date.isoformat())
+        if end_date:
+            query = query.lte("timestamp", end_date.isoformat())
+        if min_score is not None:
+            query = query.gte("overall_score", min_score)
+        if max_score is not None:
+            query = query.lte("overall_score", max_score)
+        return query
+
+    # Reuse a recent total for these filters; otherwise let the page query count.
+    # Unfiltered listings only need a planner estimate rather than a full COUNT(*).
+    filter_key = (model_name, eval_type, start_date, end_date, min_score, max_score)
+    total = get_cached_count("eval_runs", filter_key)
+    if total is not None:
+        count_method = None
+    elif any(value is not None for value in filter_key):
+        count_method = "exact"
+    else:
+        count_method = "estimated"
+
+    # A cursor page only sees rows past the cursor, so it cannot carry the total
+    query = apply_filters(
+        db.table("eval_runs_mv").select("*", count=None if cursor else count_method)
+    ).order("timestamp", desc=True).order("id", desc=True)
+
+    if cursor_filter:
+        query = query.or_(cursor_filter).limit(limit)
+    else:
+        query = query.range(offset, offset + limit - 1)
+
+    if cursor and count_method:
+        count_query = apply_filters(
+            db.table("eval_runs_mv").select("id", count=count_method, head=True)
         )
+        response, count_response = await asyncio.gather(query.execute(), count_query.execute())
+        total = set_cached_count("eval_runs", filter_key, count_response.count or 0)
+    else:
+        response = await query.execute()
+        if total is None:
+            total = set_cached_count("eval_runs", filter_key, response.count or 0)
+
+    items = EVAL_RUN_LIST_TA.validate_python(response.data)
+
+    next_cursor = None
+    if len(response.data) == limit:
+        last = response.data[-1]
+        next_cursor = encode_cursor(last["timestamp"], last["id"])
 
-    return PaginatedResponse(items=items, total=total, offset=offset, limit=limit)
+    return PaginatedResponse[EvalRun](
+        items=items, total=total, offset=offset, limit=limit, next_cursor=next_cursor
+    )
 
 
 @router.get("/{eval_id}", response_model=EvalRun)
-async def get_eval_run(eval_id: UUID):
+async def get_eval_run(eval_id: UUID, request: Request, http_response: Response):
     """Get a single evaluation run by ID."""
-    db = get_db()
+    db = await get_db()
 
-    response = (
-        db.table("eval_runs")
-        .select("*, eval_samples(count)")
+    response = await (
+        db.table("eval_runs_mv")
+        .select("*")
         .eq("id", str(eval_id))
+        .maybe_single()
         .execute()
     )
 
-    if not response.data:
+    if not response:
         raise HTTPException(status_code=404, detail="Evaluation run not found")
 
-    row = response.data[0]
-    sample_count = row.get("eval_samples", [{}])[0].get("count", 0) if row.get("eval_samples") else 0
-
-    return EvalRun(
-        id=row["id"],
-        name=row["name"],
-        model_name=row.get("model_name"),
-        eval_type=row.get("eval_type"),
-        timestamp=row["timestamp"],
-        overall_score=row.get("overall_score"),
-        metrics=row.get("metrics", {}),
-        metadata=row.get("metadata", {}),
-        file_path=row.get("file_path"),
-        created_at=row["created_at"],
-        sample_count=sample_count,
-    )
+    row = response.data
+
+    # The sample count is the only part of a run that can change after ingest
+    headers = {
+        "ETag": make_etag(row["id"], row["created_at"], row["sample_count"]),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+    }
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    http_response.headers.update(headers)
+
+    return EvalRun.model_validate(row)
 
 
 @router.delete("/{eval_id}")
 async def delete_eval_run(eval_id: UUID):
     """Delete an evaluation run and all associated samples."""
-    db = get_db()
+    db = await get_db()
 
-    db.table("eval_samples").delete().eq("eval_run_id", str(eval_id)).execute()
-    response = db.table("eval_runs").delete().eq("id", str(eval_id)).execute()
+    # eval_samples and feedback rows go with it via ON DELETE CASCADE
+    response = await db.table("eval_runs").delete().eq("id", str(eval_id)).execute()
 
     if not response.data:
         raise HTTPException(status_code=404, detail="Evaluation run not found")
 
+    await db.rpc("refresh_eval_runs_mv").execute()
+    invalidate_cached_counts()
     return {"message": "Evaluation run deleted successfully"}
 
 
+FILE_LIST_TTL_SECONDS = 5.0
+
+_file_list_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+
+
+def _scan_result_files(results_dir: str) -> List[Dict[str, Any]]:
+    """Collect *_allresults.json entries in a directory, newest first."""
+    files = []
+    with os.scandir(results_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith("_allresults.json"):
+                stat = entry.stat()
+                files.append(
+                    {
+                        "filename": entry.name,
+                        "path": entry.path,
+                        "size": stat.st_size,
+                        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    }
+                )
+
+    files.sort(key=lambda x: x["modified"], reverse=True)
+    return files
+
+
 @router.get("/files/list")
-async def list_available_files():
+async def list_available_files(request: Request, http_response: Response):
     """List available JSON files in the results directory."""
     results_dir = settings.results_dir
 
     if not os.path.exists(results_dir):
         raise HTTPException(status_code=404, detail=f"Results directory not found: {results_dir}")
 
-    files = []
-    for filename in os.listdir(results_dir):
-        if filename.endswith("_allresults.json"):
-            file_path = os.path.join(results_dir, filename)
-            stat = os.stat(file_path)
-            files.append(
-                {
-                    "filename": filename,
-                    "path": file_path,
-                    "size": stat.st_size,
-                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                }
-            )
+    # Listings rarely change between requests, so share a scan for a few seconds
+    cached = _file_list_cache.get(results_dir)
+    if cached and monotonic() - cached[0] < FILE_LIST_TTL_SECONDS:
+        files = cached[1]
+    else:
+        files = await asyncio.to_thread(_scan_result_files, results_dir)
+        _file_list_cache[results_dir] = (monotonic(), files)
+
+    # Any added, removed, renamed, resized or touched file changes the digest
+    listing = sorted((f["filename"], f["size"], f["modified"]) for f in files)
+    headers = {
+        "ETag": make_etag(hashlib.sha1(repr(listing).encode()).hexdigest()),
+        "Cache-Control": "no-cache",
+    }
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    http_response.headers.update(headers)
 
-    files.sort(key=lambda x: x["modified"], reverse=True)
     return {"files": files}
 
 
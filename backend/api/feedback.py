@@ -4,7 +4,7 @@ from uuid import UUID
 from datetime import datetime
 
 from ..database import get_db
-from ..models import Feedback, FeedbackCreate, FeedbackUpdate
+from ..models import FEEDBACK_LIST_TA, Feedback, FeedbackCreate, FeedbackUpdate
 
 router = APIRouter()
 
@@ -12,9 +12,9 @@ router = APIRouter()
 @router.get("/sample/{sample_id}/feedback", response_model=List[Feedback])
 async def get_sample_feedback(sample_id: UUID):
     """Get all feedback for a specific sample."""
-    db = get_db()
+    db = await get_db()
 
-    response = (
+    response = await (
         db.table("feedback")
         .select("*")
         .eq("sample_id", str(sample_id))
@@ -22,31 +22,18 @@ async def get_sample_feedback(sample_id: UUID):
         .execute()
     )
 
-    feedbacks = []
-    for row in response.data:
-        feedbacks.append(
-            Feedback(
-                id=row["id"],
-                sample_id=row["sample_id"],
-                feedback_type=row["feedback_type"],
-                rating=row.get("rating"),
-                notes=row.get("notes"),
-                tags=row.get("tags", []),
-                created_at=row["created_at"],
-                updated_at=row["updated_at"],
-            )
-        )
-
-    return feedbacks
+    return FEEDBACK_LIST_TA.validate_python(response.data)
 
 
 @router.post("/sample/{sample_id}/feedback", response_model=Feedback)
 async def create_feedback(sample_id: UUID, feedback: FeedbackCreate):
     """Create new feedback for a sample."""
-    db = get_db()
+    db = await get_db()
 
-    response = db.table("eval_samples").select("id").eq("id", str(sample_id)).execute()
-    if not response.data:
+    response = await (
+        db.table("eval_samples").select("id").eq("id", str(sample_id)).maybe_single().execute()
+    )
+    if not response:
         raise HTTPException(status_code=404, detail="Sample not found")
 
     now = datetime.utcnow().isoformat()
@@ -60,28 +47,19 @@ async def create_feedback(sample_id: UUID, feedback: FeedbackCreate):
         "updated_at": now,
     }
 
-    response = db.table("feedback").insert(feedback_data).execute()
+    response = await db.table("feedback").insert(feedback_data).execute()
 
     if not response.data:
         raise HTTPException(status_code=500, detail="Failed to create feedback")
 
     row = response.data[0]
-    return Feedback(
-        id=row["id"],
-        sample_id=row["sample_id"],
-        feedback_type=row["feedback_type"],
-        rating=row.get("rating"),
-        notes=row.get("notes"),
-        tags=row.get("tags", []),
-        created_at=row["created_at"],
-        updated_at=row["updated_at"],
-    )
+    return Feedback.model_validate(row)
 
 
 @router.patch("/{feedback_id}", response_model=Feedback)
 async def update_feedback(feedback_id: UUID, feedback: FeedbackUpdate):
     """Update existing feedback."""
-    db = get_db()
+    db = await get_db()
 
     update_data = {"updated_at": datetime.utcnow().isoformat()}
 
@@ -94,7 +72,7 @@ async def update_feedback(feedback_id: UUID, feedback: FeedbackUpdate):
     if feedback.tags is not None:
         update_data["tags"] = feedback.tags
 
-    response = (
+    response = await (
         db.table("feedback")
         .update(update_data)
         .eq("id", str(feedback_id))
@@ -105,24 +83,15 @@ async def update_feedback(feedback_id: UUID, feedback: FeedbackUpdate):
         raise HTTPException(status_code=404, detail="Feedback not found")
 
     row = response.data[0]
-    return Feedback(
-        id=row["id"],
-        sample_id=row["sample_id"],
-        feedback_type=row["feedback_type"],
-        rating=row.get("rating"),
-        notes=row.get("notes"),
-        tags=row.get("tags", []),
-        created_at=row["created_at"],
-        updated_at=row["updated_at"],
-    )
+    return Feedback.model_validate(row)
 
 
 @router.delete("/{feedback_id}")
 async def delete_feedback(feedback_id: UUID):
     """Delete feedback."""
-    db = get_db()
+    db = await get_db()
 
-    response = db.table("feedback").delete().eq("id", str(feedback_id)).execute()
+    response = await db.table("feedback").delete().eq("id", str(feedback_id)).execute()
 
     if not response.data:
         raise HTTPException(status_code=404, detail="Feedback not found")
@@ -133,19 +102,23 @@ async def delete_feedback(feedback_id: UUID):
 @router.get("/stats")
 async def get_feedback_stats():
     """Get aggregate feedback statistics."""
-    db = get_db()
+    db = await get_db()
 
-    response = db.table("feedback").select("feedback_type, rating").execute()
+    # One row per (feedback_type, rating) pair, already counted in the database
+    response = await db.rpc("get_feedback_stats").execute()
 
-    stats = {"total": len(response.data), "by_type": {}, "by_rating": {}}
+    stats = {"total": 0, "by_type": {}, "by_rating": {}}
 
     for row in response.data:
+        count = row["feedback_count"]
+        stats["total"] += count
+
         feedback_type = row.get("feedback_type")
         if feedback_type:
-            stats["by_type"][feedback_type] = stats["by_type"].get(feedback_type, 0) + 1
+            stats["by_type"][feedback_type] = stats["by_type"].get(feedback_type, 0) + count
 
         rating = row.get("rating")
         if rating:
-            stats["by_rating"][rating] = stats["by_rating"].get(rating, 0) + 1
+            stats["by_rating"][rating] = stats["by_rating"].get(rating, 0) + count
 
     return stats
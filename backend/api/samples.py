@@ -1,73 +1,110 @@
+import asyncio
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from uuid import UUID
 
+from ..caching import IMMUTABLE_CACHE_CONTROL, etag_matches, make_etag
 from ..database import get_db
-from ..models import EvalSample, PaginatedResponse, QuestionSummary, SampleWithEvalRun
+from ..models import (
+    EVAL_SAMPLE_LIST_TA,
+    EVAL_SAMPLE_SUMMARY_LIST_TA,
+    QUESTION_SUMMARY_LIST_TA,
+    EvalSample,
+    EvalSampleSummary,
+    PaginatedResponse,
+    SampleWithEvalRun,
+)
+from ..pagination import decode_cursor, encode_cursor, get_cached_count, set_cached_count
 
 router = APIRouter()
 
+# List views omit the large conversation and html_report columns
+SAMPLE_SUMMARY_COLUMNS = (
+    "id,eval_run_id,sample_index,question,score,metrics,example_metadata,created_at,feedback_count"
+)
 
-@router.get("/eval/{eval_id}/samples", response_model=PaginatedResponse)
+
+@router.get("/eval/{eval_id}/samples", response_model=PaginatedResponse[EvalSampleSummary])
 async def list_samples_for_eval(
     eval_id: UUID,
     offset: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     search_query: Optional[str] = None,
     min_score: Optional[float] = None,
     max_score: Optional[float] = None,
 ):
-    """List samples for a specific evaluation run with optional filters."""
-    db = get_db()
+    """
+    List samples for a specific evaluation run with optional filters.
+
+    Pass the previous page's next_cursor to seek on sample_index instead of
+    skipping rows with offset; sample_index is unique within a run.
+    """
+    db = await get_db()
+
+    cursor_index = None
+    if cursor:
+        try:
+            (cursor_index,) = decode_cursor(cursor, 1)
+            # bool is an int subclass, so a bare isinstance check would let [true] through
+            if type(cursor_index) is not int:
+                raise ValueError("Malformed cursor sample_index")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    def apply_filters(query):
+        query = query.eq("eval_run_id", str(eval_id))
+        if search_query:
+            query = query.ilike("question", f"%{search_query}%")
+        if min_score is not None:
+            query = query.gte("score", min_score)
+        if max_score is not None:
+            query = query.lte("score", max_score)
+        return query
+
+    # The eval_run_id filter keeps exact counts cheap, so only skip them on a cache hit
+    filter_key = (str(eval_id), search_query, min_score, max_score)
+    total = get_cached_count("eval_samples", filter_key)
+    count_method = None if total is not None else "exact"
+
+    # A cursor page only sees rows past the cursor, so it cannot carry the total
+    query = apply_filters(
+        db.table("eval_samples_with_feedback_count").select(
+            SAMPLE_SUMMARY_COLUMNS, count=None if cursor else count_method
+        )
+    ).order("sample_index")
 
-    query = db.table("eval_samples").select(
-        "*, feedback(count)", count="exact"
-    ).eq("eval_run_id", str(eval_id))
+    if cursor_index is not None:
+        query = query.gt("sample_index", cursor_index).limit(limit)
+    else:
+        query = query.range(offset, offset + limit - 1)
 
-    if search_query:
-        query = query.ilike("question", f"%{search_query}%")
+    if cursor and count_method:
+        count_query = apply_filters(
+            db.table("eval_samples").select("id", count=count_method, head=True)
+        )
+        response, count_response = await asyncio.gather(query.execute(), count_query.execute())
+        total = set_cached_count("eval_samples", filter_key, count_response.count or 0)
+    else:
+        response = await query.execute()
+        if total is None:
+            total = set_cached_count("eval_samples", filter_key, response.count or 0)
 
-    if min_score is not None:
-        query = query.gte("score", min_score)
-    if max_score is not None:
-        query = query.lte("score", max_score)
+    items = EVAL_SAMPLE_SUMMARY_LIST_TA.validate_python(response.data)
 
-    response = query.order("sample_index").range(offset, offset + limit - 1).execute()
+    next_cursor = None
+    if len(response.data) == limit:
+        next_cursor = encode_cursor(response.data[-1]["sample_index"])
 
-    count_query = db.table("eval_samples").select("*", count="exact", head=True).eq(
-        "eval_run_id", str(eval_id)
+    return PaginatedResponse[EvalSampleSummary](
+        items=items, total=total, offset=offset, limit=limit, next_cursor=next_cursor
     )
-    if search_query:
-        count_query = count_query.ilike("question", f"%{search_query}%")
-    total_response = count_query.execute()
-    total = total_response.count if total_response.count else 0
-
-    items = []
-    for row in response.data:
-        feedback_count = row.get("feedback", [{}])[0].get("count", 0) if row.get("feedback") else 0
-        items.append(
-            EvalSample(
-                id=row["id"],
-                eval_run_id=row["eval_run_id"],
-                sample_index=row["sample_index"],
-                question=row["question"],
-                score=row.get("score"),
-                metrics=row.get("metrics", {}),
-                conversation=row.get("conversation", []),
-                html_report=row.get("html_report"),
-                example_metadata=row.get("example_metadata", {}),
-                created_at=row["created_at"],
-                feedback_count=feedback_count,
-            )
-        )
-
-    return PaginatedResponse(items=items, total=total, offset=offset, limit=limit)
 
 
 @router.get("/compare")
 async def compare_samples(ids: List[str] = Query(..., description="List of sample IDs to compare")):
     """Compare multiple samples side-by-side."""
-    db = get_db()
+    db = await get_db()
 
     sample_ids = [id.strip() for id in ids if id.strip()]
 
@@ -80,41 +117,24 @@ async def compare_samples(ids: List[str] = Query(..., description="List of sampl
             status_code=400, detail="Maximum 4 samples can be compared at once"
         )
 
-    # Validate UUIDs
+    # Validate and normalise UUIDs
     try:
-        for sample_id in sample_ids:
-            UUID(sample_id)
+        sample_ids = [str(UUID(sample_id)) for sample_id in sample_ids]
     except ValueError as e:
         raise HTTPException(
             status_code=400, detail=f"Invalid UUID format: {str(e)}"
         )
 
-    response = db.table("eval_samples").select("*").in_("id", sample_ids).execute()
+    # compare_samples returns rows with feedback counts, in the order the IDs were given
+    response = await db.rpc("compare_samples", {"p_ids": sample_ids}).execute()
 
     if len(response.data) != len(sample_ids):
         raise HTTPException(
             status_code=404, detail="One or more samples not found"
         )
 
-    samples = []
-    for row in response.data:
-        samples.append(
-            EvalSample(
-                id=row["id"],
-                eval_run_id=row["eval_run_id"],
-                sample_index=row["sample_index"],
-                question=row["question"],
-                score=row.get("score"),
-                metrics=row.get("metrics", {}),
-                conversation=row.get("conversation", []),
-                html_report=row.get("html_report"),
-                example_metadata=row.get("example_metadata", {}),
-                created_at=row["created_at"],
-                feedback_count=0,
-            )
-        )
+    samples = EVAL_SAMPLE_LIST_TA.validate_python(response.data)
 
-    samples.sort(key=lambda s: sample_ids.index(str(s.id)))
     return {"samples": samples}
 
 
@@ -125,57 +145,29 @@ async def list_questions(
     search_query: Optional[str] = None,
 ):
     """List all unique questions with aggregated stats."""
-    db = get_db()
-
-    # Fetch samples with pagination applied to the raw data
-    # We'll aggregate in Python since Supabase doesn't have great GROUP BY support
-    query = db.table("eval_samples").select("question, eval_run_id, created_at")
-
-    if search_query:
-        query = query.ilike("question", f"%{search_query}%")
-
-    # Fetch more than we need to ensure we have enough unique questions after aggregation
-    # This is a compromise - we fetch a larger batch and aggregate in Python
-    fetch_limit = min(1000, (offset + limit) * 10)  # Fetch 10x more to ensure coverage
-    response = query.order("created_at", desc=True).range(0, fetch_limit - 1).execute()
-
-    # Aggregate the results in Python
-    question_stats = {}
-    for row in response.data:
-        q = row["question"]
-        if q not in question_stats:
-            question_stats[q] = {
-                "question": q,
-                "sample_count": 0,
-                "eval_runs": set(),
-                "latest_timestamp": row["created_at"],
-            }
-        question_stats[q]["sample_count"] += 1
-        question_stats[q]["eval_runs"].add(row["eval_run_id"])
-        # Keep the latest timestamp
-        if row["created_at"] > question_stats[q]["latest_timestamp"]:
-            question_stats[q]["latest_timestamp"] = row["created_at"]
-
-    # Convert to list and sort by latest timestamp
-    questions_list = [
-        QuestionSummary(
-            question=stats["question"],
-            sample_count=stats["sample_count"],
-            eval_run_count=len(stats["eval_runs"]),
-            latest_timestamp=stats["latest_timestamp"],
-        )
-        for stats in question_stats.values()
-    ]
-    questions_list.sort(key=lambda x: x.latest_timestamp, reverse=True)
-
-    # Calculate total unique questions
-    total = len(questions_list)
-
-    # Apply pagination to the aggregated results
-    paginated_items = questions_list[offset : offset + limit]
+    db = await get_db()
+
+    # Grouping and pagination happen in the list_question_summaries function;
+    # every row carries the total number of matching questions.
+    params = {"p_search": search_query or None, "p_offset": offset, "p_limit": limit}
+    response = await db.rpc("list_question_summaries", params).execute()
+
+    rows = response.data or []
+    if rows:
+        total = rows[0]["total_count"]
+    elif offset > 0:
+        # A page past the end has no row to carry the total, so read it from the first
+        first = await db.rpc(
+            "list_question_summaries", {**params, "p_offset": 0, "p_limit": 1}
+        ).execute()
+        total = first.data[0]["total_count"] if first.data else 0
+    else:
+        total = 0
+
+    items = QUESTION_SUMMARY_LIST_TA.validate_python(rows)
 
     return {
-        "items": [item.model_dump() for item in paginated_items],
+        "items": QUESTION_SUMMARY_LIST_TA.dump_python(items),
         "total": total,
         "offset": offset,
         "limit": limit,
@@ -189,26 +181,18 @@ async def get_samples_by_question(
     limit: int = Query(100, ge=1, le=200),
 ):
     """Get all samples for a specific question across all eval runs."""
-    db = get_db()
+    db = await get_db()
 
     # Query samples with eval_run join to get run metadata
     query = (
         db.table("eval_samples")
-        .select("*, eval_runs!inner(name, model_name, timestamp)")
-        .ilike("question", question)
-    )
-
-    # Get total count
-    count_query = (
-        db.table("eval_samples")
-        .select("*", count="exact", head=True)
+        .select("*, eval_runs!inner(name, model_name, timestamp)", count="exact")
         .ilike("question", question)
     )
-    total_response = count_query.execute()
-    total = total_response.count if total_response.count else 0
 
     # Get paginated results ordered by eval_run timestamp descending
-    response = query.order("eval_runs(timestamp)", desc=True).range(offset, offset + limit - 1).execute()
+    response = await query.order("eval_runs(timestamp)", desc=True).range(offset, offset + limit - 1).execute()
+    total = response.count or 0
 
     items = []
     for row in response.data:
@@ -244,33 +228,30 @@ async def get_samples_by_question(
 
 
 @router.get("/{sample_id}", response_model=EvalSample)
-async def get_sample(sample_id: UUID):
+async def get_sample(sample_id: UUID, request: Request, http_response: Response):
     """Get a single sample with full conversation trace."""
-    db = get_db()
+    db = await get_db()
 
-    response = (
-        db.table("eval_samples")
-        .select("*, feedback(count)")
+    response = await (
+        db.table("eval_samples_with_feedback_count")
+        .select("*")
         .eq("id", str(sample_id))
+        .maybe_single()
         .execute()
     )
 
-    if not response.data:
+    if not response:
         raise HTTPException(status_code=404, detail="Sample not found")
 
-    row = response.data[0]
-    feedback_count = row.get("feedback", [{}])[0].get("count", 0) if row.get("feedback") else 0
-
-    return EvalSample(
-        id=row["id"],
-        eval_run_id=row["eval_run_id"],
-        sample_index=row["sample_index"],
-        question=row["question"],
-        score=row.get("score"),
-        metrics=row.get("metrics", {}),
-        conversation=row.get("conversation", []),
-        html_report=row.get("html_report"),
-        example_metadata=row.get("example_metadata", {}),
-        created_at=row["created_at"],
-        feedback_count=feedback_count,
-    )
+    row = response.data
+
+    # The feedback count is the only part of a sample that can change after ingest
+    headers = {
+        "ETag": make_etag(row["id"], row["created_at"], row["feedback_count"]),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+    }
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    http_response.headers.update(headers)
+
+    return EvalSample.model_validate(row)
@@ -0,0 +1,25 @@
+from typing import Any
+from fastapi import Request
+
+# Samples and runs do not change after ingest apart from their derived counts,
+# so browsers may reuse them briefly and then revalidate with the ETag.
+IMMUTABLE_CACHE_CONTROL = "private, max-age=60, stale-while-revalidate=300"
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from the values that identify a representation."""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an ETag using weak comparison."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return _opaque_tag(etag) in {_opaque_tag(tag.strip()) for tag in header.split(",")}
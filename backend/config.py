@@ -1,4 +1,5 @@
 import json
+from functools import cached_property, lru_cache
 from typing import List
 from pydantic_settings import BaseSettings
 
@@ -12,9 +13,9 @@ class Settings(BaseSettings):
     cors_origins: str = '["http://localhost:5173"]'
     port: int = 8001
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> List[str]:
-        """Parse CORS origins from JSON string."""
+        """Parse CORS origins from JSON string (once per Settings instance)."""
         try:
             return json.loads(self.cors_origins)
         except json.JSONDecodeError:
@@ -25,4 +26,10 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Load settings from the environment and .env file once per process."""
+    return Settings()
+
+
+settings = get_settings()
@@ -1,22 +1,33 @@
-from supabase import create_client, Client
+import asyncio
+
+from supabase import acreate_client, AsyncClient
 from .config import settings
 
 
 class Database:
-    """Singleton Supabase client."""
+    """Singleton async Supabase client."""
 
-    _client: Client | None = None
+    _client: AsyncClient | None = None
+    _lock = asyncio.Lock()
 
     @classmethod
-    def get_client(cls) -> Client:
-        """Get or create Supabase client instance."""
+    async def get_client(cls) -> AsyncClient:
+        """Get or create Supabase client instance.
+
+        The PostgREST client keeps one pooled httpx.AsyncClient, so requests
+        reuse connections and never block the event loop.
+        """
         if cls._client is None:
-            cls._client = create_client(
-                settings.supabase_url, settings.supabase_key
-            )
+            # Creating the client awaits, so concurrent first callers would
+            # otherwise each build a client and connection pool of their own
+            async with cls._lock:
+                if cls._client is None:
+                    cls._client = await acreate_client(
+                        settings.supabase_url, settings.supabase_key
+                    )
         return cls._client
 
 
-def get_db() -> Client:
+async def get_db() -> AsyncClient:
     """Dependency for getting database client."""
-    return Database.get_client()
+    return await Database.get_client()
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from .config import settings
 from .api import evals, samples, feedback
 
@@ -7,6 +8,7 @@ app = FastAPI(
     title="Eval Trace Viewer API",
     description="API for exploring evaluation traces and providing feedback",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -1,12 +1,14 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional, TypeVar, Generic
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from uuid import UUID
 
 
 class EvalRunBase(BaseModel):
     """Base model for evaluation run."""
 
+    model_config = ConfigDict(frozen=True)
+
     name: str
     model_name: Optional[str] = None
     eval_type: Optional[str] = None
@@ -30,13 +32,14 @@ class EvalRun(EvalRunBase):
     created_at: datetime
     sample_count: Optional[int] = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class EvalSampleBase(BaseModel):
     """Base model for evaluation sample."""
 
+    model_config = ConfigDict(frozen=True)
+
     eval_run_id: UUID
     sample_index: int
     question: str
@@ -60,13 +63,35 @@ class EvalSample(EvalSampleBase):
     created_at: datetime
     feedback_count: Optional[int] = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class EvalSampleSummary(BaseModel):
+    """
+    Model for evaluation sample in list views, without conversation or HTML report.
+
+    IDs and created_at are only echoed back to the client, so they are kept as
+    the strings the database returns instead of being parsed per row.
+    """
+
+    id: str
+    eval_run_id: str
+    sample_index: int
+    question: str
+    score: Optional[float] = None
+    metrics: Dict[str, float] = Field(default_factory=dict)
+    example_metadata: Dict[str, Any] = Field(default_factory=dict)
+    created_at: str
+    feedback_count: Optional[int] = 0
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class FeedbackBase(BaseModel):
     """Base model for feedback."""
 
+    model_config = ConfigDict(frozen=True)
+
     sample_id: UUID
     feedback_type: str
     rating: Optional[int] = Field(None, ge=1, le=5)
@@ -99,8 +124,7 @@ class Feedback(FeedbackBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PaginationParams(BaseModel):
@@ -148,6 +172,8 @@ class IngestResponse(BaseModel):
 class QuestionSummary(BaseModel):
     """Model for question summary with aggregated stats."""
 
+    model_config = ConfigDict(frozen=True)
+
     question: str
     sample_count: int
     eval_run_count: int
@@ -172,6 +198,12 @@ class PaginatedResponse(BaseModel, Generic[T]):
     total: int
     offset: int
     limit: int
+    next_cursor: Optional[str] = None
+
 
-    class Config:
-        arbitrary_types_allowed = True
+# Reusable validators for whole pages of database rows
+EVAL_RUN_LIST_TA = TypeAdapter(List[EvalRun])
+EVAL_SAMPLE_LIST_TA = TypeAdapter(List[EvalSample])
+EVAL_SAMPLE_SUMMARY_LIST_TA = TypeAdapter(List[EvalSampleSummary])
+FEEDBACK_LIST_TA = TypeAdapter(List[Feedback])
+QUESTION_SUMMARY_LIST_TA = TypeAdapter(List[QuestionSummary])
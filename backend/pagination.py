@@ -0,0 +1,58 @@
+import base64
+import json
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Hashable, List, Optional, Tuple
+
+COUNT_CACHE_TTL_SECONDS = 30.0
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+# Insertion-ordered, so the oldest (first to expire) entries are at the front
+_count_cache: OrderedDict[Tuple[str, Hashable], Tuple[int, float]] = OrderedDict()
+
+
+def get_cached_count(table: str, filter_key: Hashable) -> Optional[int]:
+    """Return the cached total for a table and filter combination, if still fresh."""
+    entry = _count_cache.get((table, filter_key))
+    if entry is None:
+        return None
+
+    count, cached_at = entry
+    if monotonic() - cached_at > COUNT_CACHE_TTL_SECONDS:
+        _count_cache.pop((table, filter_key), None)
+        return None
+    return count
+
+
+def set_cached_count(table: str, filter_key: Hashable, count: int) -> int:
+    """Store a freshly computed total and return it, evicting stale entries."""
+    now = monotonic()
+    key = (table, filter_key)
+    _count_cache.pop(key, None)
+    _count_cache[key] = (count, now)
+
+    while _count_cache:
+        _, oldest_at = next(iter(_count_cache.values()))
+        expired = now - oldest_at > COUNT_CACHE_TTL_SECONDS
+        if not expired and len(_count_cache) <= COUNT_CACHE_MAX_ENTRIES:
+            break
+        _count_cache.popitem(last=False)
+    return count
+
+
+def invalidate_cached_counts() -> None:
+    """Drop all cached totals after rows are inserted or deleted."""
+    _count_cache.clear()
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort-key values of a page's last row as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor from encode_cursor, raising ValueError if it is malformed."""
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Malformed cursor")
+    return values
@@ -1,24 +1,69 @@
-import json
+import asyncio
 import os
 import re
 from datetime import datetime
-from typing import List, Dict, Any
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Set
 from pathlib import Path
 
+import orjson
+from postgrest import ReturnMethod
+from postgrest.exceptions import APIError
+from supabase import AsyncClient
+
 from ..database import get_db
 from ..config import settings
+from ..pagination import invalidate_cached_counts
+
+# Files ingested at once; each one is a parse plus a stream of insert requests
+INGEST_CONCURRENCY = 8
+
+# Sample rows per insert request, and insert requests in flight per file
+SAMPLE_BATCH_SIZE = 500
+SAMPLE_INSERT_CONCURRENCY = 4
+
+RESULT_FILE_SUFFIX = "_allresults.json"
+
+REQUIRED_KEYS = frozenset({"score", "metrics", "htmls", "convos", "metadata"})
 
+# Rest of the line after the first "Question:" in a user prompt
+QUESTION_RE = re.compile(r"Question:([^\n]*)")
 
-def parse_filename(filename: str) -> Dict[str, Any]:
+AGGREGATE_METRIC_SUFFIXES = (":std", ":min", ":max")
+
+FILENAME_RE = re.compile(
+    r"^(?P<eval_type>[^_]+)_(?P<model_name>.+?)_temp[\d.]+_"
+    r"(?P<timestamp>\d{8}_\d{6})$"
+)
+
+
+def parse_filename(stem: str) -> Dict[str, Any]:
     """
-    Parse metadata from filename.
-    Expected format: {eval_type}_{model}_{config}_temp{temp}_{timestamp}_allresults.json
-    Example: polymarket_openai__gpt-oss-20b-high_temp1.0_20251112_025328_allresults.json
+    Parse metadata from a result filename with the _allresults.json suffix removed.
+    Expected format: {eval_type}_{model}_{config}_temp{temp}_{timestamp}
+    Example: polymarket_openai__gpt-oss-20b-high_temp1.0_20251112_025328
     """
+    match = FILENAME_RE.match(stem)
+    if match:
+        try:
+            timestamp = datetime.strptime(match["timestamp"], "%Y%m%d_%H%M%S")
+        except ValueError:
+            pass
+        else:
+            return {
+                "eval_type": match["eval_type"],
+                "model_name": match["model_name"],
+                "timestamp": timestamp,
+            }
+
+    return _parse_filename_parts(stem)
+
+
+def _parse_filename_parts(stem: str) -> Dict[str, Any]:
+    """Parse filename metadata part by part, for names FILENAME_RE does not match."""
     metadata = {"eval_type": None, "model_name": None, "timestamp": None}
 
-    filename = filename.replace("_allresults.json", "")
-    parts = filename.split("_")
+    parts = stem.split("_")
 
     if len(parts) >= 1:
         metadata["eval_type"] = parts[0]
@@ -44,46 +89,162 @@ def parse_filename(filename: str) -> Dict[str, Any]:
 
 def validate_result_file(data: Dict[str, Any]) -> bool:
     """Validate that the result file has the expected structure."""
-    required_keys = ["score", "metrics", "htmls", "convos", "metadata"]
-    return all(key in data for key in required_keys)
+    return isinstance(data, dict) and REQUIRED_KEYS <= data.keys()
+
+
+def iter_samples(data: Dict[str, Any], eval_run_id: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield eval_samples rows for a result file one at a time.
+
+    Consumes the file's htmls and convos: each entry is released from the
+    parsed document once its row has been yielded.
+    """
+    htmls = data.get("htmls", [])
+    convos = data.get("convos", [])
+    example_metadata_list = data.get("metadata", {}).get("example_level_metadata", [])
+    score = data.get("score")
+
+    # Run-level metrics are the same for every sample, minus the aggregate stats;
+    # the rows share one dict since they are only serialized, never mutated
+    sample_metrics = {
+        key: value
+        for key, value in data.get("metrics", {}).items()
+        if not key.endswith(AGGREGATE_METRIC_SUFFIXES)
+    }
+
+    sample_total = min(len(htmls), len(convos))
+    metadata_total = len(example_metadata_list)
+    # Shared by rows without example metadata, like sample_metrics above
+    no_metadata: Dict[str, Any] = {}
+
+    for i in range(sample_total):
+        html = htmls[i]
+        convo = convos[i]
+        example_metadata = example_metadata_list[i] if i < metadata_total else no_metadata
+
+        question = example_metadata.get("question", "")
+        if not question and convo:
+            for msg in convo:
+                if msg.get("role") != "user":
+                    continue
+                content = msg.get("content")
+                match = QUESTION_RE.search(content) if isinstance(content, str) else None
+                if match:
+                    question = match.group(1).strip()
+                    break
+
+        yield {
+            "eval_run_id": eval_run_id,
+            "sample_index": i,
+            "question": question,
+            "score": score,
+            "metrics": sample_metrics,
+            "conversation": convo,
+            "html_report": html,
+            "example_metadata": example_metadata,
+        }
+
+        # The yielded row now holds the only reference, so the HTML report and
+        # conversation are freed as soon as their batch has been inserted
+        htmls[i] = convos[i] = None
+
+
+def load_result_file(file_path: str) -> Dict[str, Any]:
+    """Read and parse a result file."""
+    with open(file_path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return orjson.loads(f.read())
+
+
+async def fetch_ingested_paths(file_paths: List[str]) -> Set[str]:
+    """Return the subset of file_paths that already have an eval run."""
+    db = await get_db()
+    ingested = set()
+
+    # Chunked so the IN filter stays well under PostgREST's URL length limit
+    chunk_size = 100
+    for i in range(0, len(file_paths), chunk_size):
+        chunk = file_paths[i : i + chunk_size]
+        response = await (
+            db.table("eval_runs")
+            .select("file_path")
+            .in_("file_path", chunk)
+            .execute()
+        )
+        ingested.update(row["file_path"] for row in response.data)
+
+    return ingested
 
 
-async def ingest_file(file_path: str) -> Dict[str, Any]:
+def _is_payload_too_large(error: APIError) -> bool:
+    return str(error.code) == "413" or "too large" in (error.message or "").lower()
+
+
+def _raise_first_error(tasks: Set[asyncio.Task]) -> None:
+    """Retrieve every finished task's exception, then raise the first one."""
+    errors = [task.exception() for task in tasks]
+    for error in errors:
+        if error is not None:
+            raise error
+
+
+async def insert_samples(db: AsyncClient, batch: List[Dict[str, Any]]) -> None:
+    """Insert a batch of samples, splitting it while the payload is too large."""
+    try:
+        # Nothing reads the inserted rows back, so spare the server echoing the HTML
+        await (
+            db.table("eval_samples")
+            .insert(batch, returning=ReturnMethod.minimal)
+            .execute()
+        )
+    except APIError as e:
+        if len(batch) == 1 or not _is_payload_too_large(e):
+            raise
+        middle = len(batch) // 2
+        await insert_samples(db, batch[:middle])
+        await insert_samples(db, batch[middle:])
+
+
+async def ingest_file(
+    file_path: str,
+    skip_if_in: Optional[Set[str]] = None,
+    default_timestamp: Optional[datetime] = None,
+) -> Dict[str, Any]:
     """
     Ingest a single result file into the database.
 
+    skip_if_in is the set of already-ingested paths from fetch_ingested_paths;
+    when omitted the file is looked up individually. default_timestamp is
+    used for runs whose filename has no timestamp, and defaults to now.
+
     Returns dict with status: 'success', 'skipped', or 'error' and optional message.
     """
-    db = get_db()
+    db = await get_db()
+
+    if skip_if_in is None:
+        skip_if_in = await fetch_ingested_paths([file_path])
+
+    if file_path in skip_if_in:
+        return {"status": "skipped", "message": "File already ingested"}
 
     try:
-        with open(file_path, "r") as f:
-            data = json.load(f)
+        data = await asyncio.to_thread(load_result_file, file_path)
     except Exception as e:
         return {"status": "error", "message": f"Failed to read file: {str(e)}"}
 
     if not validate_result_file(data):
         return {"status": "error", "message": "Invalid file structure"}
 
-    filename = os.path.basename(file_path)
-    parsed_metadata = parse_filename(filename)
-
-    existing = (
-        db.table("eval_runs")
-        .select("id")
-        .eq("file_path", file_path)
-        .execute()
-    )
-
-    if existing.data:
-        return {"status": "skipped", "message": "File already ingested"}
+    stem = os.path.basename(file_path).removesuffix(RESULT_FILE_SUFFIX)
+    parsed_metadata = parse_filename(stem)
 
     eval_run_data = {
-        "name": filename.replace("_allresults.json", ""),
+        "name": stem,
         "model_name": parsed_metadata.get("model_name"),
         "eval_type": parsed_metadata.get("eval_type"),
         "timestamp": (
-            parsed_metadata.get("timestamp") or datetime.now()
+            parsed_metadata.get("timestamp") or default_timestamp or datetime.now()
         ).isoformat(),
         "overall_score": data.get("score"),
         "metrics": data.get("metrics", {}),
@@ -91,57 +252,46 @@ async def ingest_file(file_path: str) -> Dict[str, Any]:
         "file_path": file_path,
     }
 
-    eval_run_response = db.table("eval_runs").insert(eval_run_data).execute()
+    eval_run_response = await db.table("eval_runs").insert(eval_run_data).execute()
 
     if not eval_run_response.data:
         return {"status": "error", "message": "Failed to create eval run"}
 
     eval_run_id = eval_run_response.data[0]["id"]
 
-    htmls = data.get("htmls", [])
-    convos = data.get("convos", [])
-    example_metadata_list = data.get("metadata", {}).get("example_level_metadata", [])
-
-    samples = []
-    for i, (html, convo) in enumerate(zip(htmls, convos)):
-        example_metadata = (
-            example_metadata_list[i] if i < len(example_metadata_list) else {}
-        )
-
-        question = example_metadata.get("question", "")
-        if not question and convo:
-            for msg in convo:
-                if msg.get("role") == "user":
-                    content = msg.get("content", "")
-                    if isinstance(content, str) and "Question:" in content:
-                        question = content.split("Question:")[1].split("\n")[0].strip()
-                        break
-
-        sample_metrics = {}
-        for key, value in data.get("metrics", {}).items():
-            if not key.endswith(":std") and not key.endswith(":min") and not key.endswith(":max"):
-                sample_metrics[key] = value
-
-        sample_data = {
+    samples = iter_samples(data, eval_run_id)
+    sample_count = 0
+    # Keep a fixed number of inserts in flight, starting the next batch as
+    # soon as any one finishes rather than waiting on the slowest of a group
+    pending = set()
+    try:
+        while batch := list(islice(samples, SAMPLE_BATCH_SIZE)):
+            if len(pending) >= SAMPLE_INSERT_CONCURRENCY:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                _raise_first_error(done)
+            pending.add(asyncio.create_task(insert_samples(db, batch)))
+            sample_count += len(batch)
+        if pending:
+            done, pending = await asyncio.wait(pending)
+            _raise_first_error(done)
+    except Exception as e:
+        # The run row exists, so report its id; ingest_files still refreshes the view
+        return {
+            "status": "error",
+            "message": f"Failed to insert samples: {str(e)}",
             "eval_run_id": eval_run_id,
-            "sample_index": i,
-            "question": question,
-            "score": data.get("score"),
-            "metrics": sample_metrics,
-            "conversation": convo,
-            "html_report": html,
-            "example_metadata": example_metadata,
         }
-        samples.append(sample_data)
-
-    batch_size = 100
-    for i in range(0, len(samples), batch_size):
-        batch = samples[i : i + batch_size]
-        db.table("eval_samples").insert(batch).execute()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
     return {
         "status": "success",
-        "message": f"Ingested {len(samples)} samples",
+        "message": f"Ingested {sample_count} samples",
         "eval_run_id": eval_run_id,
     }
 
@@ -149,14 +299,42 @@ async def ingest_file(file_path: str) -> Dict[str, Any]:
 async def ingest_files(file_paths: List[str]) -> Dict[str, Any]:
     """Ingest multiple files and return summary."""
     results = {"ingested": 0, "skipped": 0, "errors": []}
+    # The skip set is fetched once up front, so a path listed twice must be
+    # collapsed here or both copies would be ingested
+    file_paths = list(dict.fromkeys(file_paths))
+    already_ingested = await fetch_ingested_paths(file_paths)
+    ingested_at = datetime.now()
+    semaphore = asyncio.Semaphore(INGEST_CONCURRENCY)
 
-    for file_path in file_paths:
+    outcomes: Dict[str, Dict[str, Any]] = {}
+
+    async def ingest_one(file_path: str) -> None:
+        # A failing file is reported in the summary instead of aborting the batch
         if not os.path.exists(file_path):
-            results["errors"].append(f"{file_path}: File not found")
-            continue
+            outcomes[file_path] = {"status": "error", "message": "File not found"}
+            return
+        async with semaphore:
+            try:
+                outcomes[file_path] = await ingest_file(
+                    file_path,
+                    skip_if_in=already_ingested,
+                    default_timestamp=ingested_at,
+                )
+            except Exception as e:
+                outcomes[file_path] = {"status": "error", "message": str(e)}
 
-        result = await ingest_file(file_path)
+    try:
+        await asyncio.gather(*(ingest_one(path) for path in file_paths))
+    finally:
+        # Refresh whenever a run row was written, even if the batch was interrupted,
+        # so no ingested run is left out of eval_runs_mv
+        if any("eval_run_id" in result for result in outcomes.values()):
+            db = await get_db()
+            await db.rpc("refresh_eval_runs_mv").execute()
+            invalidate_cached_counts()
 
+    for file_path in file_paths:
+        result = outcomes[file_path]
         if result["status"] == "success":
             results["ingested"] += 1
         elif result["status"] == "skipped":
@@ -167,22 +345,27 @@ async def ingest_files(file_paths: List[str]) -> Dict[str, Any]:
     return results
 
 
+def list_result_files(directory: str) -> List[str]:
+    """Return paths of all result files in a directory."""
+    with os.scandir(directory) as entries:
+        return [
+            entry.path
+            for entry in entries
+            if entry.name.endswith(RESULT_FILE_SUFFIX) and entry.is_file()
+        ]
+
+
 async def scan_and_ingest(directory: str) -> Dict[str, Any]:
     """Scan directory for result files and ingest them."""
     if not os.path.exists(directory):
         return {"ingested": 0, "skipped": 0, "errors": [f"Directory not found: {directory}"]}
 
-    file_paths = []
-    for filename in os.listdir(directory):
-        if filename.endswith("_allresults.json"):
-            file_paths.append(os.path.join(directory, filename))
-
+    file_paths = await asyncio.to_thread(list_result_files, directory)
     return await ingest_files(file_paths)
 
 
 if __name__ == "__main__":
     import sys
-    import asyncio
 
     if len(sys.argv) < 2:
         print("Usage: python -m backend.scripts.ingest_results <file_path> [<file_path2> ...]")
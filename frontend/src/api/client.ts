@@ -2,6 +2,7 @@ import axios from 'axios';
 import type {
   EvalRun,
   EvalSample,
+  EvalSampleSummary,
   Feedback,
   FeedbackCreate,
   FeedbackUpdate,
@@ -61,7 +62,7 @@ export const sampleApi = {
     offset: number = 0,
     limit: number = 50,
     filters?: SampleFilters
-  ): Promise<PaginatedResponse<EvalSample>> => {
+  ): Promise<PaginatedResponse<EvalSampleSummary>> => {
     const params = { offset, limit, ...filters };
     const response = await api.get(`/api/samples/eval/${evalId}/samples`, { params });
     return response.data;
@@ -2,7 +2,7 @@ import { useState } from 'react';
 import { useQuery } from '@tanstack/react-query';
 import { useParams, useNavigate, Link } from 'react-router-dom';
 import { sampleApi, evalApi } from '../api/client';
-import type { EvalSample } from '../types';
+import type { EvalSampleSummary } from '../types';
 
 export default function SamplesList() {
   const { evalId } = useParams<{ evalId: string }>();
@@ -124,7 +124,7 @@ export default function SamplesList() {
                   type="checkbox"
                   onChange={(e) => {
                     if (e.target.checked) {
-                      setSelectedSamples(data?.items.map((s: EvalSample) => s.id) || []);
+                      setSelectedSamples(data?.items.map((s: EvalSampleSummary) => s.id) || []);
                     } else {
                       setSelectedSamples([]);
                     }
@@ -147,7 +147,7 @@ export default function SamplesList() {
             </tr>
           </thead>
           <tbody className="bg-white divide-y divide-gray-200">
-            {data?.items.map((sample: EvalSample) => (
+            {data?.items.map((sample: EvalSampleSummary) => (
               <tr
                 key={sample.id}
                 className="hover:bg-gray-50 cursor-pointer transition"
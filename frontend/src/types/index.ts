@@ -39,6 +39,18 @@ export interface EvalSample {
   feedback_count?: number;
 }
 
+export interface EvalSampleSummary {
+  id: string;
+  eval_run_id: string;
+  sample_index: number;
+  question: string;
+  score?: number;
+  metrics: Record<string, number>;
+  example_metadata: Record<string, any>;
+  created_at: string;
+  feedback_count?: number;
+}
+
 export interface Message {
   role?: string;
   content?: string | any;
@@ -84,6 +96,7 @@ export interface PaginatedResponse<T> {
   total: number;
   offset: number;
   limit: number;
+  next_cursor?: string | null;
 }
 
 export interface EvalRunFilters {
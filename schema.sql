@@ -4,6 +4,9 @@
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Enable trigram matching for ILIKE '%...%' search indexes
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Table: eval_runs
 -- Stores evaluation run metadata
 CREATE TABLE IF NOT EXISTS eval_runs (
@@ -49,18 +52,109 @@ CREATE TABLE IF NOT EXISTS feedback (
 );
 
 -- Indexes for performance
-CREATE INDEX IF NOT EXISTS idx_eval_runs_timestamp ON eval_runs(timestamp DESC);
-CREATE INDEX IF NOT EXISTS idx_eval_runs_model_name ON eval_runs(model_name);
-CREATE INDEX IF NOT EXISTS idx_eval_runs_eval_type ON eval_runs(eval_type);
+-- List filter/sort indexes for eval runs live on eval_runs_mv below
 CREATE INDEX IF NOT EXISTS idx_eval_runs_file_path ON eval_runs(file_path);
 
 CREATE INDEX IF NOT EXISTS idx_eval_samples_eval_run_id ON eval_samples(eval_run_id);
 CREATE INDEX IF NOT EXISTS idx_eval_samples_sample_index ON eval_samples(sample_index);
-CREATE INDEX IF NOT EXISTS idx_eval_samples_question ON eval_samples USING GIN(to_tsvector('english', question));
+-- (eval_run_id, sample_index) is already indexed by the UNIQUE constraint
+CREATE INDEX IF NOT EXISTS idx_eval_samples_question_trgm ON eval_samples USING GIN(question gin_trgm_ops);
 
 CREATE INDEX IF NOT EXISTS idx_feedback_sample_id ON feedback(sample_id);
 CREATE INDEX IF NOT EXISTS idx_feedback_created_at ON feedback(created_at DESC);
 
+-- Materialized view: eval_runs_mv
+-- Eval runs with their sample count stored as a flat column. Runs only change on
+-- ingest and delete, which call refresh_eval_runs_mv() afterwards.
+CREATE MATERIALIZED VIEW IF NOT EXISTS eval_runs_mv AS
+SELECT r.*, COUNT(s.id) AS sample_count
+FROM eval_runs r
+LEFT JOIN eval_samples s ON s.eval_run_id = r.id
+GROUP BY r.id;
+
+-- Unique index required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_eval_runs_mv_id ON eval_runs_mv(id);
+CREATE INDEX IF NOT EXISTS idx_eval_runs_mv_timestamp_id ON eval_runs_mv(timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_eval_runs_mv_eval_type_timestamp ON eval_runs_mv(eval_type, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_eval_runs_mv_model_name_trgm ON eval_runs_mv USING GIN(model_name gin_trgm_ops);
+
+-- Function: refresh_eval_runs_mv
+-- Rebuilds eval_runs_mv without blocking concurrent reads
+CREATE OR REPLACE FUNCTION refresh_eval_runs_mv()
+RETURNS void
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY eval_runs_mv;
+END;
+$$;
+
+-- View: eval_samples_with_feedback_count
+-- Eval samples with their feedback count as a flat column
+CREATE OR REPLACE VIEW eval_samples_with_feedback_count AS
+SELECT s.*,
+    (SELECT COUNT(*) FROM feedback f WHERE f.sample_id = s.id) AS feedback_count
+FROM eval_samples s;
+
+-- Function: list_question_summaries
+-- Unique questions with aggregated stats, grouped and paginated in the database
+CREATE OR REPLACE FUNCTION list_question_summaries(
+    p_search TEXT DEFAULT NULL,
+    p_offset INTEGER DEFAULT 0,
+    p_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (
+    question TEXT,
+    sample_count BIGINT,
+    eval_run_count BIGINT,
+    latest_timestamp TIMESTAMPTZ,
+    total_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        s.question,
+        COUNT(*) AS sample_count,
+        COUNT(DISTINCT s.eval_run_id) AS eval_run_count,
+        MAX(s.created_at) AS latest_timestamp,
+        COUNT(*) OVER () AS total_count
+    FROM eval_samples s
+    WHERE p_search IS NULL OR s.question ILIKE '%' || p_search || '%'
+    GROUP BY s.question
+    ORDER BY MAX(s.created_at) DESC, s.question
+    OFFSET p_offset
+    LIMIT p_limit;
+$$;
+
+-- Function: compare_samples
+-- Samples for the given IDs with their feedback counts, ordered by position in p_ids
+DROP FUNCTION IF EXISTS compare_samples(UUID[]);
+CREATE FUNCTION compare_samples(p_ids UUID[])
+RETURNS SETOF eval_samples_with_feedback_count
+LANGUAGE sql STABLE
+AS $$
+    SELECT v.*
+    FROM eval_samples_with_feedback_count v
+    WHERE v.id = ANY(p_ids)
+    ORDER BY array_position(p_ids, v.id);
+$$;
+
+-- Function: get_feedback_stats
+-- Feedback counts per (feedback_type, rating) pair for the stats endpoint
+CREATE OR REPLACE FUNCTION get_feedback_stats()
+RETURNS TABLE (
+    feedback_type TEXT,
+    rating INTEGER,
+    feedback_count BIGINT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT f.feedback_type, f.rating, COUNT(*) AS feedback_count
+    FROM feedback f
+    GROUP BY f.feedback_type, f.rating;
+$$;
+
 -- Enable Row Level Security (RLS) - Optional, remove if not needed
 -- ALTER TABLE eval_runs ENABLE ROW LEVEL SECURITY;
 -- ALTER TABLE eval_samples ENABLE ROW LEVEL SECURITY;